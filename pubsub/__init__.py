@@ -7,6 +7,8 @@ publish-subscribe patterns in Python applications.
 
 from .channel import Channel
 from .message import Message
-from .pubsub import fetch, publish, subscribe
+from .pubsub import fetch, fetch_batch, publish, publish_batch, subscribe
 
-__all__ = ["Message", "Channel", "publish", "fetch", "subscribe"]
+__all__ = [
+    "Message", "Channel", "publish", "publish_batch", "fetch", "fetch_batch", "subscribe"
+]
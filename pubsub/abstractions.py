@@ -1,14 +1,13 @@
 """Platform abstraction utilities for the pubsub library."""
 
+import functools
 import os
 import sys
 import tempfile
 from pathlib import Path
 
-# Cache for the base directory to avoid repeated lookups
-_base_dir_cache = None
-
 
+@functools.lru_cache(maxsize=1)
 def get_base_dir() -> Path:
     """
     Get the base directory for pubsub storage that works across platforms.
@@ -17,19 +16,15 @@ def get_base_dir() -> Path:
     uses the system's temporary directory with a 'pubsub' subdirectory.
     On Unix-like systems, prefers /dev/shm if available for better performance.
 
-    The result is cached after the first call for performance.
+    The result is cached after the first call for performance; call
+    get_base_dir.cache_clear() to pick up a changed PUBSUB_HOME.
 
     Returns:
         Path: The base directory path for pubsub storage
     """
-    global _base_dir_cache
-    if _base_dir_cache is not None:
-        return _base_dir_cache
-
     env_dir = os.environ.get("PUBSUB_HOME")
     if env_dir:
-        _base_dir_cache = Path(env_dir)
-        return _base_dir_cache
+        return Path(env_dir)
 
     shm_path = Path("/dev/shm")
     if shm_path.exists() and shm_path.is_dir():
@@ -38,8 +33,7 @@ def get_base_dir() -> Path:
         temp_dir = Path(tempfile.gettempdir())
 
     # Append pubsub subdirectory
-    _base_dir_cache = temp_dir / "pubsub"
-    return _base_dir_cache
+    return temp_dir / "pubsub"
 
 
 def is_process_running(pid: int) -> bool:
@@ -1,15 +1,58 @@
 """Channel class for pubsub system using shared memory and FIFO queues."""
 
+import base64
+import functools
 import logging
 import os
-import random
 import re
 import stat
 import string
+import threading
+import time
+from collections.abc import Iterator
 from pathlib import Path
 
 from .abstractions import get_base_dir, is_process_running
 
+# Characters allowed in a channel topic, wildcards included
+_TOPIC_CHARS = string.ascii_letters + string.digits + "+=.-"
+
+# Translation table deleting every allowed character, leaving only invalid ones
+_TOPIC_STRIP_TABLE = str.maketrans("", "", _TOPIC_CHARS)
+
+# Capacity in bytes of the per-channel buffer of queued message IDs (512 IDs)
+_QUEUE_BUFFER_SIZE = 8 * 512
+
+# Channel directory listing reused by matching_active_paths() while the base
+# directory and its mtime are unchanged, along with per-topic match results
+_index_key: tuple[Path, int] | None = None
+_index_entries: list[tuple[Path, str, int]] = []
+_index_matches: dict[str, list[tuple[Path, int]]] = {}
+
+# A listing is only reused when the base directory was last modified at least this
+# long before the scan, so filesystems with coarse timestamps cannot hide a change
+_INDEX_MTIME_MARGIN_NS = 1_000_000_000
+
+# Maximum number of topics whose match results are kept for one listing
+_INDEX_MAX_TOPICS = 1024
+
+# Permissions of the channel FIFO: read/write for the owner and its group
+_QUEUE_MODE = stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_topic_pattern(topic_pattern: str) -> re.Pattern[str]:
+    """
+    Compile a channel topic with wildcards into a regex, memoized per topic.
+
+    Args:
+        topic_pattern: The channel topic, possibly containing '=' and '+' wildcards
+
+    Returns:
+        The compiled regex pattern
+    """
+    return re.compile(topic_pattern.replace("=", "[a-zA-Z0-9-]").replace("+", "[a-zA-Z0-9.-]*"))
+
 
 class Channel:
     """
@@ -24,6 +67,24 @@ class Channel:
     - '+' for multiple words wildcard
     """
 
+    __slots__ = (
+        "_fp",
+        "_keepalive_fp",
+        "_dir_fd",
+        "_id_buffer",
+        "_id_start",
+        "_id_end",
+        "_fetch_lock",
+        "topic",
+        "process_id",
+        "random_id",
+        "directory_name",
+        "directory_path",
+        "queue_path",
+        "_directory_str",
+        "_queue_str",
+    )
+
     def __init__(self, topic: str):
         """
         Initialize a new channel.
@@ -36,12 +97,24 @@ class Channel:
         """
         self._validate_topic(topic)
         self._fp = -1
+        self._keepalive_fp = -1
+        self._dir_fd = -1
+        # Message IDs read from the queue but not fetched yet: buffer[start:end]
+        self._id_buffer = bytearray(_QUEUE_BUFFER_SIZE)
+        self._id_start = 0
+        self._id_end = 0
+        # Held while the buffer is refilled and an ID is claimed from it, so threads
+        # fetching from the same channel never take the same ID or lose one
+        self._fetch_lock = threading.Lock()
         self.topic = topic
         self.process_id = os.getpid()
         self.random_id = self._generate_random_id()
         self.directory_name = f"{topic}_{self.random_id}_{self.process_id}"
         self.directory_path = get_base_dir() / self.directory_name
         self.queue_path = self.directory_path / "queue"
+        # String forms of the paths above, computed once for the os.* calls
+        self._directory_str = os.fspath(self.directory_path)
+        self._queue_str = os.fspath(self.queue_path)
 
         # Create the channel directory and FIFO
         self._create_channel()
@@ -53,8 +126,9 @@ class Channel:
 
 
     def _generate_random_id(self) -> str:
-        """Generate a random 12-character string."""
-        return "".join(random.choices(string.ascii_letters + string.digits, k=12))
+        """Generate a random 12-character alphanumeric string from the OS entropy pool."""
+        # 8 random bytes encode to 13 base32 characters (A-Z, 2-7) before padding
+        return base64.b32encode(os.urandom(8))[:12].decode("ascii")
 
     @staticmethod
     def _validate_topic(topic: str) -> None:
@@ -72,26 +146,27 @@ class Channel:
         if not topic:
             raise ValueError("Topic cannot be empty")
 
-        # Check for invalid characters using regex
-        if not re.match(r"^[a-zA-Z0-9+=.-]+$", topic):
-            invalid_chars = set(topic) - set(
-                "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+=.-"
-            )
+        # Deleting every allowed character leaves only the invalid ones
+        invalid_chars = topic.translate(_TOPIC_STRIP_TABLE)
+        if invalid_chars:
             raise ValueError(
-                f"Topic '{topic}' contains invalid characters: {sorted(invalid_chars)}."
+                f"Topic '{topic}' contains invalid characters: {sorted(set(invalid_chars))}."
                 "Only [a-zA-Z0-9+=.-] are allowed."
             )
 
     def _create_channel(self) -> None:
         """Create the channel directory and FIFO queue."""
         try:
-            self.directory_path.mkdir(parents=True, exist_ok=True)
-            if not self.queue_path.exists():
-                os.mkfifo(str(self.queue_path))
-                os.chmod(
-                    str(self.queue_path),
-                    stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP,
-                )
+            try:
+                os.mkdir(self._directory_str)
+            except FileNotFoundError:
+                # First channel: the base directory does not exist yet
+                self.directory_path.parent.mkdir(parents=True, exist_ok=True)
+                os.mkdir(self._directory_str)
+            # The random id makes the directory new, so the FIFO cannot exist yet
+            os.mkfifo(self._queue_str, _QUEUE_MODE)
+            # mkfifo's mode is filtered by the umask, so enforce group access explicitly
+            os.chmod(self._queue_str, _QUEUE_MODE)
         except OSError as e:
             raise RuntimeError(f"Failed to create channel directory or FIFO: {e}") from e
 
@@ -100,6 +175,11 @@ class Channel:
         """
         Open the FIFO queue for reading in non-blocking mode.
 
+        The channel also holds a write end of its own FIFO, so the queue never reports
+        end-of-file (hang-up) to selectors when publishers close their end between
+        messages. A descriptor on the channel directory lets message files be opened
+        and removed relative to it, without resolving the full path each time.
+
         Raises:
             OSError: If unable to open the FIFO for reading
         """
@@ -107,8 +187,14 @@ class Channel:
             return  # Already open
 
         try:
-            self._fp = os.open(str(self.queue_path), os.O_RDONLY | os.O_NONBLOCK)
+            self._fp = os.open(self._queue_str, os.O_RDONLY | os.O_NONBLOCK)
+            self._keepalive_fp = os.open(self._queue_str, os.O_WRONLY | os.O_NONBLOCK)
+            self._dir_fd = os.open(self._directory_str, os.O_RDONLY | os.O_DIRECTORY)
         except OSError as e:
+            for fd in (self._keepalive_fp, self._fp):
+                if fd != -1:
+                    os.close(fd)
+            self._fp = self._keepalive_fp = -1
             raise OSError(f"Failed to open queue for reading: {e}") from e
 
 
@@ -125,6 +211,10 @@ class Channel:
             return  # Already closed or never opened
 
         try:
+            os.close(self._dir_fd)
+            self._dir_fd = -1
+            os.close(self._keepalive_fp)
+            self._keepalive_fp = -1
             os.close(self._fp)
             self._fp = -1
         except OSError as e:
@@ -132,22 +222,34 @@ class Channel:
                 f"Failed to close channel file descriptor {self.directory_name}: {e}"
             ) from e
         finally:
-            Channel._delete_recursive(self.directory_path)
+            Channel._delete_recursive(self._directory_str)
+            Channel._forget_queue_writer(self._queue_str)
+
+    @staticmethod
+    def _forget_queue_writer(queue_path: str) -> None:
+        """Close the write end publishers of this process cached for a removed queue."""
+        # Imported here since the pubsub module depends on this one
+        from .pubsub import _forget_queue_writer
+
+        _forget_queue_writer(queue_path)
 
     @staticmethod
-    def _delete_recursive(dir: Path) -> None:
+    def _delete_recursive(dir: Path | str) -> None:
         """Recursively delete a directory and all its contents."""
-        if not dir.exists():
+        try:
+            entries = os.scandir(dir)
+        except FileNotFoundError:
             return
-        for item in dir.iterdir():
-            try:
-                if item.is_dir():
-                    Channel._delete_recursive(item)
-                else:
-                    item.unlink()
-            except OSError as e:
-                logging.warning(f"Failed to delete {item}: {e}")
-        dir.rmdir()
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        Channel._delete_recursive(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                except OSError as e:
+                    logging.warning("Failed to delete %s: %s", entry.path, e)
+        os.rmdir(dir)
 
     @staticmethod
     def cleanup_inactive() -> None:
@@ -161,10 +263,89 @@ class Channel:
         for path in Channel.inactive_paths():
             try:
                 Channel._delete_recursive(path)
-                logging.info(f"Cleaned up inactive channel at {path}")
+                Channel._forget_queue_writer(os.path.join(path, "queue"))
+                logging.info("Cleaned up inactive channel at %s", path)
             except OSError as e:
-                logging.warning(f"Failed to clean up inactive channel at {path}: {e}")
+                logging.warning("Failed to clean up inactive channel at %s: %s", path, e)
+
+
+    @staticmethod
+    def _scan_paths() -> Iterator[tuple[Path, int]]:
+        """
+        Scan the pubsub base directory for channel directories.
 
+        Uses os.scandir so directory checks rely on the cached entry type instead of
+        issuing a stat call per entry.
+
+        Yields:
+            Tuples of (channel path, owning process id)
+        """
+        try:
+            with os.scandir(get_base_dir()) as entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    name = entry.name
+                    separator = name.rfind("_")
+                    if separator < 0 or name.find("_") == separator:
+                        continue  # Not a {topic}_{random_id}_{pid} directory
+                    try:
+                        pid = int(name[separator + 1 :])
+                    except ValueError:
+                        continue
+                    yield Path(entry.path), pid
+        except FileNotFoundError:
+            return
+
+    @staticmethod
+    def _scan_liveness() -> Iterator[tuple[Path, bool]]:
+        """
+        Scan channel directories and resolve whether their owning process is running.
+
+        Each distinct process id is checked only once per scan, since a process usually
+        owns several channels.
+
+        Yields:
+            Tuples of (channel path, True if the owning process is running)
+        """
+        running: dict[int, bool] = {}
+        for path, pid in Channel._scan_paths():
+            is_running = running.get(pid)
+            if is_running is None:
+                is_running = running[pid] = is_process_running(pid)
+            yield path, is_running
+
+    @staticmethod
+    def _channel_index() -> tuple[list[tuple[Path, str, int]], dict[str, list[tuple[Path, int]]]]:
+        """
+        Get the channel directory listing, rescanning only when the base directory changed.
+
+        Creating or removing a channel directory updates the base directory's mtime, so
+        one stat call is enough to validate the previous listing. A listing is cached
+        only once the mtime is safely in the past.
+
+        Returns:
+            Tuple of ((channel path, topic pattern, owning pid) entries, cache of match
+            results per topic for these entries)
+        """
+        global _index_key, _index_entries, _index_matches
+        base_dir = get_base_dir()
+        try:
+            mtime_ns = os.stat(base_dir).st_mtime_ns
+        except FileNotFoundError:
+            return [], {}
+        if (base_dir, mtime_ns) == _index_key:
+            return _index_entries, _index_matches
+
+        scan_time_ns = time.time_ns()
+        entries = [
+            (path, path.name.partition("_")[0], pid) for path, pid in Channel._scan_paths()
+        ]
+        if mtime_ns < scan_time_ns - _INDEX_MTIME_MARGIN_NS:
+            _index_key, _index_entries, _index_matches = (base_dir, mtime_ns), entries, {}
+            return entries, _index_matches
+        _index_key = None
+        return entries, {}
 
     @staticmethod
     def active_paths() -> list[Path]:
@@ -176,20 +357,7 @@ class Channel:
         Returns:
             List of active channel paths
         """
-        channels = []
-        pubsub_path = get_base_dir()
-        if not pubsub_path.exists():
-            return channels
-
-        for item in [i for i in pubsub_path.iterdir() if i.is_dir()]:
-            parts = item.name.split("_")
-            if len(parts) < 3:
-                continue
-            pid = int(parts[-1])
-            if is_process_running(pid):
-                channels.append(item)
-
-        return sorted(channels)
+        return sorted(path for path, is_running in Channel._scan_liveness() if is_running)
 
     @staticmethod
     def inactive_paths() -> list[Path]:
@@ -201,20 +369,7 @@ class Channel:
         Returns:
             List of inactive channel paths
         """
-        channels = []
-        pubsub_path = get_base_dir()
-        if not pubsub_path.exists():
-            return channels
-
-        for item in [i for i in pubsub_path.iterdir() if i.is_dir()]:
-            parts = item.name.split("_")
-            if len(parts) < 3:
-                continue
-            pid = int(parts[-1])
-            if not is_process_running(pid):
-                channels.append(item)
-
-        return sorted(channels)
+        return sorted(path for path, is_running in Channel._scan_liveness() if not is_running)
 
     @staticmethod
     def matching_active_paths(topic: str) -> list[Path]:
@@ -230,17 +385,29 @@ class Channel:
             topic: The topic to match against
 
         Returns:
-            List of Path objects for matching channel directories
+            List of Path objects for matching channel directories, in no particular order
         """
+        entries, matches = Channel._channel_index()
+        candidates = matches.get(topic)
+        if candidates is None:
+            candidates = [
+                (path, pid)
+                for path, topic_pattern, pid in entries
+                if _compile_topic_pattern(topic_pattern).fullmatch(topic)
+            ]
+            if len(matches) >= _INDEX_MAX_TOPICS:
+                matches.clear()
+            matches[topic] = candidates
+
+        # Liveness is always checked, since a process can exit without a directory change
         matching_channels = []
-        for item in Channel.active_paths():
-            parts = item.name.split("_")
-            topic_pattern = parts[0]
-            regex_pattern = topic_pattern.replace("=", "[a-zA-Z0-9-]").replace(
-                "+", "[a-zA-Z0-9.-]*"
-            )
-            if re.fullmatch(regex_pattern, topic):
-                matching_channels.append(item)
+        running: dict[int, bool] = {}
+        for path, pid in candidates:
+            is_running = running.get(pid)
+            if is_running is None:
+                is_running = running[pid] = is_process_running(pid)
+            if is_running:
+                matching_channels.append(path)
         return matching_channels
 
     def __str__(self) -> str:
@@ -1,8 +1,9 @@
 """Message class for pubsub library."""
 
-import io
+import functools
+import itertools
 import json
-import random
+import os
 import struct
 import time
 from typing import BinaryIO
@@ -14,6 +15,61 @@ SUPPORTED_MESSAGE_VERSIONS = [MESSAGE_FORMAT_VERSION]
 # Magic number to identify message format ("PMSG" in ASCII)
 MESSAGE_MAGIC_NUMBER = 0x504D5347
 
+# Fixed-size message prefix: magic, version, id, timestamp and topic length
+_HEADER = struct.Struct("!IBQQI")
+
+# Length prefix for the variable-size headers and content sections
+_LENGTH = struct.Struct("!I")
+
+# Content size above which write() sends the payload separately instead of
+# copying it into the serialized buffer
+_LARGE_CONTENT_SIZE = 64 * 1024
+
+# Shared JSON codec for headers: json.dumps() with keyword arguments builds a new
+# encoder on every call, and compact separators keep the serialized headers small
+_HEADERS_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_HEADERS_DECODER = json.JSONDecoder()
+
+# Serialized form of empty headers, written and recognized without the JSON codec
+_EMPTY_HEADERS_JSON = b"{}"
+
+
+@functools.lru_cache(maxsize=256)
+def _prefix_struct(topic_length: int) -> struct.Struct:
+    """
+    Get a compiled struct for the serialized prefix up to the headers, for a topic length.
+
+    Topics repeat across messages while header sizes vary, so only the topic length is
+    part of the key and the cache is not thrashed by changing headers.
+
+    Args:
+        topic_length: Length of the encoded topic in bytes
+
+    Returns:
+        Struct packing the fixed prefix, the topic and the headers length
+    """
+    return struct.Struct(f"{_HEADER.format}{topic_length}sI")
+
+
+# Message ID generator state, see Message._next_id()
+_id_counter = itertools.count()
+_id_tag = 0
+
+
+def _seed_ids() -> None:
+    """Seed the message ID counter and tag; called at import and in forked children."""
+    global _id_counter, _id_tag
+    _id_counter = itertools.count((time.time_ns() // 1_000) >> 16)
+    # Processes running at the same time never share a tag while their pids differ modulo
+    # 2**16, which is always the case when pid_max is at most 65536
+    _id_tag = os.getpid() & 0xFFFF
+
+
+_seed_ids()
+if hasattr(os, "register_at_fork"):
+    # A forked child must not reuse the parent's counter and tag
+    os.register_at_fork(after_in_child=_seed_ids)
+
 # Scalar types allowed as header values
 HeaderValueTypes = str | int | float | bool | None
 """Type alias for valid header value types. Headers can contain strings, integers,
@@ -27,6 +83,8 @@ Header = dict[str, HeaderValueTypes]
 class Message:
     """Represents a message in the pubsub system."""
 
+    __slots__ = ("id", "timestamp", "topic", "content", "headers")
+
     def __init__(self, topic: str, content: bytes, headers: Header | None = None):
         """
         Initialize a new message.
@@ -37,7 +95,7 @@ class Message:
             headers: Optional dictionary of string key-value pairs for metadata
         """
         self.id = self._next_id()
-        self.timestamp = int(time.time() * 1_000_000)  # microseconds since epoch
+        self.timestamp = time.time_ns() // 1_000  # microseconds since epoch
         self.topic = topic
         self.content = content
         self.headers = headers if headers is not None else {}
@@ -45,19 +103,23 @@ class Message:
     @staticmethod
     def _next_id() -> int:
         """
-        Generate a unique message ID based on current time in microseconds
-        with the least significant 16 bits replaced by random bits.
+        Generate a message ID from a process-local monotonic counter.
+
+        The high 48 bits come from a counter seeded with the process start time in
+        units of 2**16 microseconds, and the low 16 bits are the low bits of the process
+        id. IDs are strictly increasing within a process, never repeat even when
+        messages are created in a burst, and require no clock read.
 
-        This provides both time-based ordering and uniqueness even when
-        multiple messages are created within the same microsecond.
+        The counter advances once per message, not with the clock, so under load it runs
+        ahead of real time. Uniqueness across processes therefore rests on the tag: two
+        processes whose pids are equal modulo 2**16 (possible when pid_max is larger)
+        can generate the same IDs. Publishing never overwrites a pending message file,
+        so such a collision fails the publish instead of losing a message.
 
         Returns:
             A 64-bit integer ID
         """
-        time_micro = int(time.time() * 1_000_000)
-        high_bits = (time_micro >> 16) << 16  # Keep all but the last 16 bits
-        random_bits = random.randint(0, 0xFFFF)
-        return high_bits | random_bits
+        return (next(_id_counter) << 16) | _id_tag
 
     def write(self, stream: BinaryIO) -> None:
         """
@@ -78,22 +140,64 @@ class Message:
         Args:
             stream: Binary stream to write to
         """
-        # Encode strings as UTF-8
+        if len(self.content) >= _LARGE_CONTENT_SIZE:
+            # Avoid doubling memory for large payloads
+            stream.write(self._serialize_prefix())
+            stream.write(self.content)
+        else:
+            stream.write(self._serialize())
+
+    def write_fd(self, fd: int) -> None:
+        """
+        Write the message to a file descriptor with a single vectored write.
+
+        The prefix and the content are handed to os.writev as separate buffers, so
+        the content is never copied into a joined bytes object. Uses the same binary
+        format as write().
+
+        Args:
+            fd: File descriptor open for writing
+        """
+        prefix = self._serialize_prefix()
+        written = os.writev(fd, (prefix, self.content))
+        if written < len(prefix) + len(self.content):
+            # Partial write: finish with plain writes from where writev stopped
+            remaining = memoryview(prefix + self.content)[written:]
+            while remaining:
+                remaining = remaining[os.write(fd, remaining) :]
+
+    def _serialize_prefix(self) -> bytes:
+        """
+        Serialize everything that precedes the content, including its length.
+
+        Returns:
+            The serialized prefix as bytes
+        """
         topic_bytes = self.topic.encode("utf-8")
-        headers_json = json.dumps(self.headers, ensure_ascii=False)
-        headers_bytes = headers_json.encode("utf-8")
-
-        # Write each component to stream
-        stream.write(struct.pack("!I", MESSAGE_MAGIC_NUMBER))
-        stream.write(struct.pack("!B", MESSAGE_FORMAT_VERSION))
-        stream.write(struct.pack("!Q", self.id))
-        stream.write(struct.pack("!Q", self.timestamp))
-        stream.write(struct.pack("!I", len(topic_bytes)))
-        stream.write(topic_bytes)
-        stream.write(struct.pack("!I", len(headers_bytes)))
-        stream.write(headers_bytes)
-        stream.write(struct.pack("!I", len(self.content)))
-        stream.write(self.content)
+        if self.headers:
+            headers_bytes = _HEADERS_ENCODER.encode(self.headers).encode("utf-8")
+        else:
+            headers_bytes = _EMPTY_HEADERS_JSON
+        topic_length = len(topic_bytes)
+        prefix = _prefix_struct(topic_length).pack(
+            MESSAGE_MAGIC_NUMBER,
+            MESSAGE_FORMAT_VERSION,
+            self.id,
+            self.timestamp,
+            topic_length,
+            topic_bytes,
+            len(headers_bytes),
+        )
+        return b"".join((prefix, headers_bytes, _LENGTH.pack(len(self.content))))
+
+    def _serialize(self) -> bytes:
+        """
+        Serialize the whole message into a single bytes object.
+
+        Returns:
+            The serialized message as bytes
+        """
+        return self._serialize_prefix() + self.content
 
     @staticmethod
     def _read_exact(stream: BinaryIO, n: int) -> bytes:
@@ -113,80 +217,91 @@ class Message:
         Raises:
             ValueError: If EOF is reached before reading all bytes
         """
-        chunks = []
-        bytes_read = 0
+        # Fast path: most streams (BytesIO, regular files) return everything at once
+        data = stream.read(n) or b""
+        if len(data) == n:
+            return data
+
+        # Slow path: fill a preallocated buffer in place instead of joining chunks
+        buffer = bytearray(n)
+        view = memoryview(buffer)
+        bytes_read = len(data)
+        view[:bytes_read] = data
+        readinto = getattr(stream, "readinto", None)
         while bytes_read < n:
-            chunk = stream.read(n - bytes_read)
-            if not chunk:
+            if readinto is not None:
+                count = readinto(view[bytes_read:])
+            else:
+                chunk = stream.read(n - bytes_read)
+                count = len(chunk) if chunk else 0
+                view[bytes_read : bytes_read + count] = chunk or b""
+            if not count:
                 # EOF reached - no more data available
                 raise ValueError(f"Expected {n} bytes, but only read {bytes_read} bytes (EOF)")
-            chunks.append(chunk)
-            bytes_read += len(chunk)
+            bytes_read += count
 
-        return b"".join(chunks)
+        view.release()
+        return bytes(buffer)
 
-    @classmethod
-    def read(cls, stream: BinaryIO) -> "Message":
+    @staticmethod
+    def _check_prefix(magic: int, version: int) -> None:
         """
-        Read and deserialize a message from a binary stream.
+        Validate the magic number and format version of a serialized message.
 
         Args:
-            stream: Binary stream to read from
+            magic: The magic number read from the message prefix
+            version: The format version read from the message prefix
 
-        Returns:
-            A new Message instance
+        Raises:
+            ValueError: If the magic number or the version is not recognized
         """
-        # Read and validate magic number
-        magic_data = cls._read_exact(stream, 4)
-        magic = struct.unpack("!I", magic_data)[0]
-
         if magic != MESSAGE_MAGIC_NUMBER:
             raise ValueError(
                 f"Invalid magic number 0x{magic:08X}, expected 0x{MESSAGE_MAGIC_NUMBER:08X}. This"
                 "data is not a valid message."
             )
 
-        # Read and validate format version
-        version_data = cls._read_exact(stream, 1)
-        version = struct.unpack("!B", version_data)[0]
-
         if version not in SUPPORTED_MESSAGE_VERSIONS:
             raise ValueError(
                 f"Unsupported message format version {version}, expected one of "
                 f"{SUPPORTED_MESSAGE_VERSIONS}."
             )
 
-        # Read id
-        id_data = cls._read_exact(stream, 8)
-        message_id = struct.unpack("!Q", id_data)[0]
-
-        # Read timestamp
-        timestamp_data = cls._read_exact(stream, 8)
-        message_timestamp = struct.unpack("!Q", timestamp_data)[0]
+    @classmethod
+    def read(cls, stream: BinaryIO) -> "Message":
+        """
+        Read and deserialize a message from a binary stream.
 
-        # Read topic
-        topic_length_data = cls._read_exact(stream, 4)
-        topic_length = struct.unpack("!I", topic_length_data)[0]
-        topic_data = cls._read_exact(stream, topic_length)
-        topic = topic_data.decode("utf-8")
+        Args:
+            stream: Binary stream to read from
 
-        # Read headers
-        headers_length_data = cls._read_exact(stream, 4)
-        headers_length = struct.unpack("!I", headers_length_data)[0]
-        headers_data = cls._read_exact(stream, headers_length)
-        headers_json = headers_data.decode("utf-8")
-        headers = json.loads(headers_json) if headers_json else {}
+        Returns:
+            A new Message instance
+        """
+        # Read the fixed-size prefix in one go
+        header_data = cls._read_exact(stream, _HEADER.size)
+        magic, version, message_id, message_timestamp, topic_length = _HEADER.unpack_from(
+            header_data
+        )
+
+        if magic != MESSAGE_MAGIC_NUMBER or version != MESSAGE_FORMAT_VERSION:
+            # Not the current format: reject it or accept an older supported version
+            cls._check_prefix(magic, version)
+
+        # Read topic together with the headers length that follows it
+        topic_data = cls._read_exact(stream, topic_length + _LENGTH.size)
+        topic = str(memoryview(topic_data)[:topic_length], "utf-8")
+        (headers_length,) = _LENGTH.unpack_from(topic_data, topic_length)
+
+        # Read headers together with the content length that follows them
+        headers_data = cls._read_exact(stream, headers_length + _LENGTH.size)
+        headers = cls._decode_headers(memoryview(headers_data)[:headers_length])
+        (data_length,) = _LENGTH.unpack_from(headers_data, headers_length)
 
         # Read data
-        data_length_data = cls._read_exact(stream, 4)
-        data_length = struct.unpack("!I", data_length_data)[0]
         message_content = cls._read_exact(stream, data_length)
 
-        # Create new instance and set the id and timestamp directly
-        message = cls(topic=topic, content=message_content, headers=headers)
-        message.id = message_id
-        message.timestamp = message_timestamp
-        return message
+        return cls._restore(message_id, message_timestamp, topic, message_content, headers)
 
     def to_bytes(self) -> bytes:
         """
@@ -195,23 +310,113 @@ class Message:
         Returns:
             The serialized message as bytes
         """
-        stream = io.BytesIO()
-        self.write(stream)
-        return stream.getvalue()
+        return self._serialize()
 
     @classmethod
     def from_bytes(cls, data: bytes) -> "Message":
         """
         Convenience method to deserialize message from bytes.
 
+        Parses the buffer directly instead of going through a stream.
+
         Args:
             data: The serialized message bytes
 
         Returns:
             A new Message instance
+
+        Raises:
+            ValueError: If the data is truncated or not a valid message
+        """
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        return cls._parse(data)
+
+    @staticmethod
+    def _decode_headers(data: bytes | memoryview) -> Header:
+        """
+        Decode the serialized headers section of a message.
+
+        Empty headers are recognized without going through the JSON decoder.
+
+        Args:
+            data: The headers JSON as UTF-8 encoded bytes
+
+        Returns:
+            A new headers dictionary
+        """
+        if not data or data == _EMPTY_HEADERS_JSON:
+            return {}
+        headers: Header = _HEADERS_DECODER.decode(str(data, "utf-8"))
+        return headers
+
+    @classmethod
+    def _parse(cls, data: bytes, offset: int = 0) -> "Message":
+        """
+        Deserialize a message from a bytes buffer starting at the given offset.
+
+        Section bounds are computed up front, so the whole message is checked against
+        the buffer length once and each section is sliced exactly once.
+
+        Args:
+            data: Buffer holding the serialized message
+            offset: Position of the message in the buffer
+
+        Returns:
+            A new Message instance
+
+        Raises:
+            ValueError: If the data is truncated or not a valid message
         """
-        stream = io.BytesIO(data)
-        return cls.read(stream)
+        try:
+            magic, version, message_id, message_timestamp, topic_length = (
+                _HEADER.unpack_from(data, offset)
+            )
+            if magic != MESSAGE_MAGIC_NUMBER or version != MESSAGE_FORMAT_VERSION:
+                # Not the current format: reject it or accept an older supported version
+                cls._check_prefix(magic, version)
+            topic_start = offset + _HEADER.size
+            headers_start = topic_start + topic_length + _LENGTH.size
+            (headers_length,) = _LENGTH.unpack_from(data, headers_start - _LENGTH.size)
+            content_start = headers_start + headers_length + _LENGTH.size
+            (data_length,) = _LENGTH.unpack_from(data, content_start - _LENGTH.size)
+        except struct.error as e:
+            raise ValueError(f"Truncated message: {e}") from e
+
+        content_end = content_start + data_length
+        if content_end > len(data):
+            raise ValueError(f"Expected {content_end} bytes, but only got {len(data)} bytes")
+
+        topic = data[topic_start : topic_start + topic_length].decode("utf-8")
+        headers = cls._decode_headers(data[headers_start : headers_start + headers_length])
+        message_content = data[content_start:content_end]
+
+        return cls._restore(message_id, message_timestamp, topic, message_content, headers)
+
+    @classmethod
+    def _restore(
+        cls, message_id: int, timestamp: int, topic: str, content: bytes, headers: Header
+    ) -> "Message":
+        """
+        Rebuild a deserialized message without generating a new id and timestamp.
+
+        Args:
+            message_id: The deserialized message id
+            timestamp: The deserialized timestamp in microseconds since epoch
+            topic: The deserialized topic
+            content: The deserialized payload
+            headers: The deserialized headers
+
+        Returns:
+            A new Message instance with the given fields
+        """
+        message = cls.__new__(cls)
+        message.id = message_id
+        message.timestamp = timestamp
+        message.topic = topic
+        message.content = content
+        message.headers = headers
+        return message
 
     def __repr__(self) -> str:
         return f"Message(id={self.id}, topic='{self.topic}', content_length={len(self.content)})"
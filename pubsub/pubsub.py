@@ -2,88 +2,355 @@
 
 import logging
 import os
-import re
+import select
+import selectors
 import signal
+import string
 import struct
+import threading
 import time
-from collections.abc import Callable
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from pathlib import Path
 
 from .abstractions import get_base_dir
 from .channel import Channel
 from .message import Header, Message
 
+# Translation table deleting every character allowed in a published topic
+_PUBLISH_STRIP_TABLE = str.maketrans("", "", string.ascii_letters + string.digits + ".-")
 
-def publish(topic: str, data: bytes, headers: Header | None = None) -> int:
+# Message files up to this size are read with a single os.read and parsed in place;
+# larger ones are streamed so the payload is not copied twice
+_SMALL_MESSAGE_SIZE = 64 * 1024
+
+# Message ids are written to channel queues as 8-byte big-endian integers
+_MESSAGE_ID = struct.Struct("!Q")
+
+# Largest queue write guaranteed to be atomic (PIPE_BUF), in whole message IDs
+_ATOMIC_QUEUE_WRITE_SIZE = getattr(select, "PIPE_BUF", 512) // _MESSAGE_ID.size * _MESSAGE_ID.size
+
+# Write ends of channel queues kept open across publish() calls, keyed by queue path
+# in least recently used order; the lock also prevents an fd from being evicted and
+# closed while another thread writes to it
+_queue_writers: OrderedDict[str, int] = OrderedDict()
+_queue_writers_lock = threading.Lock()
+
+# Maximum number of cached queue write ends, kept well below common fd limits
+_QUEUE_WRITER_CACHE_SIZE = 128
+
+
+def _reset_queue_writers() -> None:
+    """Give a forked child a fresh queue writer lock and an empty writer cache."""
+    global _queue_writers_lock
+    # The parent's lock may have been held by another thread at fork time
+    _queue_writers_lock = threading.Lock()
+    for fd in _queue_writers.values():
+        try:
+            os.close(fd)
+        except OSError:
+            pass  # Already closed by the child
+    _queue_writers.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    # A forked child must not wait on a lock it can never acquire
+    os.register_at_fork(after_in_child=_reset_queue_writers)
+
+
+def _write_message_file(path: str, message: Message) -> None:
     """
-    Publish a message to a topic.
+    Write a serialized message to a new file.
 
     Args:
-        topic: The topic to publish to (only alphanumeric, dots, and hyphens allowed)
-        data: The message payload as bytes
-        headers: Optional dictionary with string keys and scalar values
-                 (str, int, float, bool, None) for metadata
+        path: Path of the file to create
+        message: The message to write
+
+    Raises:
+        FileExistsError: If the file exists, e.g. a pending message with the same ID
+    """
+    # Never replace an existing file: that would silently drop a pending message
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        message.write_fd(fd)
+    finally:
+        os.close(fd)
+
+
+def _queue_writer(queue_path: str) -> int:
+    """
+    Get a write end for a channel queue, opening and caching it on first use.
+
+    Must be called with _queue_writers_lock held.
+
+    Args:
+        queue_path: Path of the channel FIFO
+
     Returns:
-        The number of times the messages was published in a channel
+        A non-blocking file descriptor open for writing on the queue
 
     Raises:
-        ValueError: If topic contains invalid characters (must be [a-zA-Z0-9.-])
-        RuntimeError: If unable to publish to any matching channels
+        FileNotFoundError: If the queue does not exist
+        OSError: If the queue cannot be opened, e.g. it has no reader
+    """
+    fd = _queue_writers.get(queue_path)
+    if fd is not None:
+        _queue_writers.move_to_end(queue_path)
+        return fd
+
+    # A new channel often replaces ones that went away, e.g. temporary reply channels:
+    # close the write ends whose FIFO was removed, since their paths are never reused
+    for stale_path, stale_fd in list(_queue_writers.items()):
+        if os.fstat(stale_fd).st_nlink == 0:
+            del _queue_writers[stale_path]
+            os.close(stale_fd)
+
+    fd = os.open(queue_path, os.O_WRONLY | os.O_NONBLOCK)
+    _queue_writers[queue_path] = fd
+    if len(_queue_writers) > _QUEUE_WRITER_CACHE_SIZE:
+        _, evicted_fd = _queue_writers.popitem(last=False)
+        os.close(evicted_fd)
+    return fd
+
+
+def _discard_queue_writer(queue_path: str) -> None:
     """
+    Close and forget the cached write end of a channel queue, if any.
 
-    # Validate that topic contains only allowed characters (no wildcards)
-    if not re.match(r"^[a-zA-Z0-9.-]+$", topic):
+    Must be called with _queue_writers_lock held.
+
+    Args:
+        queue_path: Path of the channel FIFO
+    """
+    fd = _queue_writers.pop(queue_path, None)
+    if fd is not None:
+        os.close(fd)
+
+
+def _forget_queue_writer(queue_path: str) -> None:
+    """
+    Close the cached write end of a channel queue that is being removed, if any.
+
+    Args:
+        queue_path: Path of the channel FIFO
+    """
+    with _queue_writers_lock:
+        _discard_queue_writer(queue_path)
+
+
+def _validate_publish_topic(topic: str) -> None:
+    """
+    Validate that a topic contains only characters allowed when publishing.
+
+    Args:
+        topic: The topic to validate
+
+    Raises:
+        ValueError: If topic is empty or contains invalid characters (must be [a-zA-Z0-9.-])
+    """
+    # Wildcards are only meaningful when subscribing
+    if not topic or topic.translate(_PUBLISH_STRIP_TABLE):
         raise ValueError(
             f"Topic '{topic}' can only contain alphanumeric characters, dots, and hyphens "
             "[a-zA-Z0-9.-] when publishing"
         )
 
-    message = Message(topic=topic, content=data, headers=headers)
-    tmp_dir = get_base_dir() / "tmp"
-    tmp_dir.mkdir(exist_ok=True)  # Ensure temporary directory exists
-    message_temp_file = tmp_dir / f"{message.id}"
-    with open(message_temp_file, "wb") as msg_file:
-        message.write(msg_file)
+
+def _deliver(channel_dirs: list[Path], messages: list[Message]) -> int:
+    """
+    Deliver messages to channel directories and notify their queues.
+
+    Each channel gets every message file first, then all message IDs in as few queue
+    writes as possible, so subscribers see the messages in order. When a channel queue
+    fills up, the messages whose ID did not fit are dropped for that channel and their
+    files removed.
+
+    Args:
+        channel_dirs: Directories of the channels to deliver to
+        messages: The messages to deliver, in publication order
+
+    Returns:
+        The number of channels at least one of the messages was delivered to
+    """
+    message_names = [str(message.id) for message in messages]
+    message_ids = b"".join([_MESSAGE_ID.pack(message.id) for message in messages])
+    temp_files: list[str] | None = None
+    if len(channel_dirs) > 1:
+        # Write each message once and hard link it into every channel directory
+        tmp_dir = get_base_dir() / "tmp"
+        temp_files = []
+        try:
+            for name, message in zip(message_names, messages, strict=True):
+                temp_file = os.path.join(tmp_dir, name)
+                try:
+                    _write_message_file(temp_file, message)
+                except FileNotFoundError:
+                    # Create the temporary directory on first use only
+                    tmp_dir.mkdir(parents=True, exist_ok=True)
+                    _write_message_file(temp_file, message)
+                temp_files.append(temp_file)
+        except FileExistsError as e:
+            # Only remove the files written here, the existing one belongs to another message
+            for temp_file in temp_files:
+                os.unlink(temp_file)
+            logging.warning("Failed to publish message %s: %s", message_names[0], e)
+            return 0
 
     publication_count = 0
-    matching_channels = Channel.matching_active_paths(topic)
-    for channel_dir in matching_channels:
-        queue_path = channel_dir / "queue"
-        if not queue_path.exists():
+    for channel_dir in channel_dirs:
+        channel_str = os.fspath(channel_dir)
+        queue_path = os.path.join(channel_str, "queue")
+        try:
+            # Get the queue first: it doubles as the existence check, and no message
+            # file is left behind for a channel that cannot be notified
+            with _queue_writers_lock:
+                _queue_writer(queue_path)
+        except FileNotFoundError:
             logging.warning(
-                f"Channel directory {channel_dir} does not contain a queue file. Skipping."
+                "Channel directory %s does not contain a queue file. Skipping.", channel_dir
             )
             continue
+        except OSError as e:
+            logging.warning(
+                "Failed to publish message %s to %s: %s", message_names[0], queue_path, e
+            )
+            continue
+        created = queued = 0
         try:
-            message_file_path = channel_dir / str(message.id)
-            os.link(str(message_temp_file), str(message_file_path))
-            with os.fdopen(
-                os.open(str(queue_path), os.O_WRONLY | os.O_NONBLOCK), "wb"
-            ) as queue_file:
-                queue_file.write(struct.pack("!Q", message.id))
+            for index, name in enumerate(message_names):
+                message_file_path = os.path.join(channel_str, name)
+                if temp_files is None:
+                    # Single subscriber: write the message in place, no tmp file or link
+                    _write_message_file(message_file_path, messages[index])
+                else:
+                    os.link(temp_files[index], message_file_path)
+                created += 1
+            # Each write of at most PIPE_BUF bytes is atomic, so concurrent publishers
+            # never interleave IDs within a chunk, only between the chunks of a batch
+            with _queue_writers_lock:
+                queue_fd = _queue_writer(queue_path)
+                for offset in range(0, len(message_ids), _ATOMIC_QUEUE_WRITE_SIZE):
+                    written = os.write(
+                        queue_fd, message_ids[offset : offset + _ATOMIC_QUEUE_WRITE_SIZE]
+                    )
+                    queued += written // _MESSAGE_ID.size
+            publication_count += 1
+        except OSError as e:
+            if not isinstance(e, (BlockingIOError, FileExistsError)):
+                # The channel went away: drop its write end so it gets reopened or evicted
+                with _queue_writers_lock:
+                    _discard_queue_writer(queue_path)
+            # Remove the files created here whose ID never reached the queue: nobody
+            # would fetch them. An already existing file belongs to another message.
+            for name in message_names[queued:created]:
+                try:
+                    os.unlink(os.path.join(channel_str, name))
+                except FileNotFoundError:
+                    pass
+            if queued:
+                # The queue filled up partway through a batch: the first messages got in
                 publication_count += 1
-        except (OSError, BrokenPipeError) as e:
-            logging.warning(f"Failed to publish message {message.id} to {queue_path}: {e}")
-
-    try:
-        message_temp_file.unlink()
-    except FileNotFoundError:
-        logging.debug(f"Temporary message file {message_temp_file} already removed.")
+                logging.warning(
+                    "Queue %s is full: dropped %i of %i messages.",
+                    queue_path,
+                    len(messages) - queued,
+                    len(messages),
+                )
+            else:
+                logging.warning(
+                    "Failed to publish message %s to %s: %s", message_names[0], queue_path, e
+                )
+
+    for temp_file in temp_files or ():
+        try:
+            os.unlink(temp_file)
+        except FileNotFoundError:
+            logging.debug("Temporary message file %s already removed.", temp_file)
 
     return publication_count
 
 
+def publish(topic: str, data: bytes, headers: Header | None = None) -> int:
+    """
+    Publish a message to a topic.
+
+    Args:
+        topic: The topic to publish to (only alphanumeric, dots, and hyphens allowed)
+        data: The message payload as bytes
+        headers: Optional dictionary with string keys and scalar values
+                 (str, int, float, bool, None) for metadata
+    Returns:
+        The number of times the messages was published in a channel
+
+    Raises:
+        ValueError: If topic contains invalid characters (must be [a-zA-Z0-9.-])
+        RuntimeError: If unable to publish to any matching channels
+    """
+    _validate_publish_topic(topic)
+
+    matching_channels = Channel.matching_active_paths(topic)
+    if not matching_channels:
+        return 0
+
+    return _deliver(matching_channels, [Message(topic=topic, content=data, headers=headers)])
+
+
+def publish_batch(topic: str, contents: Iterable[bytes], headers: Header | None = None) -> int:
+    """
+    Publish several messages to a topic at once.
+
+    Matching channels are looked up once for the whole batch, and each channel is
+    notified of all its messages with as few queue writes as possible. Subscribers
+    receive the messages in the order given, but a batch larger than PIPE_BUF bytes of
+    IDs (512 messages on Linux) may be interleaved with messages of other publishers.
+
+    A channel queue only holds as many pending IDs as its pipe buffer allows (8192
+    messages with the default 64 KiB buffer on Linux). When a batch does not fit, the
+    messages that did not get in are dropped for that channel and a warning is logged.
+
+    Args:
+        topic: The topic to publish to (only alphanumeric, dots, and hyphens allowed)
+        contents: The message payloads as bytes
+        headers: Optional dictionary with string keys and scalar values
+                 (str, int, float, bool, None) shared by every message of the batch
+
+    Returns:
+        The number of channels at least one message was published in, 0 if the batch
+        is empty
+
+    Raises:
+        ValueError: If topic contains invalid characters (must be [a-zA-Z0-9.-])
+    """
+    _validate_publish_topic(topic)
+
+    matching_channels = Channel.matching_active_paths(topic)
+    if not matching_channels:
+        return 0
+
+    # Each message gets its own copy, so changing the headers of one leaves the others
+    messages = [
+        Message(topic=topic, content=data, headers=None if headers is None else dict(headers))
+        for data in contents
+    ]
+    if not messages:
+        return 0
+
+    return _deliver(matching_channels, messages)
+
+
 def fetch(channel: Channel) -> Message | None:
     """
     Fetch a single message from a channel (non-blocking).
 
     Reads an 8-byte message ID from the FIFO queue, then loads the actual message
-    from the corresponding file.
+    from the corresponding file. Queued IDs are drained in bulk and buffered in the
+    channel, so a backlog of messages costs a single read syscall.
 
     Args:
         channel: The channel to fetch from
 
     Returns:
-        Message if one is available, None otherwise
+        Message if one is available, None once the queue is empty
 
     Raises:
         ValueError: If message format is invalid
@@ -92,28 +359,84 @@ def fetch(channel: Channel) -> Message | None:
     if not channel.is_open:
         raise RuntimeError("Channel must be open to fetch messages")
 
-    # Read message ID from queue (non-blocking)
+    buffer = channel._id_buffer
+    with channel._fetch_lock:
+        while True:
+            start, end = channel._id_start, channel._id_end
+            if end - start < _MESSAGE_ID.size:
+                # Move any partial ID to the front, then fill the rest of the preallocated
+                # buffer: never read more IDs than there is room to hold (non-blocking)
+                buffer[: end - start] = buffer[start:end]
+                start, end = 0, end - start
+                try:
+                    end += os.readv(channel._fp, [memoryview(buffer)[end:]])
+                except BlockingIOError:
+                    # No data available (non-blocking read)
+                    channel._id_start, channel._id_end = start, end
+                    return None
+
+                if end - start < _MESSAGE_ID.size:
+                    # No data available or incomplete ID
+                    channel._id_start, channel._id_end = start, end
+                    return None
+
+            (id,) = _MESSAGE_ID.unpack_from(buffer, start)
+            channel._id_start, channel._id_end = start + _MESSAGE_ID.size, end
+            # Resolved relative to the open channel directory, not from the root
+            message_name = str(id)
+            try:
+                msg_fd = os.open(message_name, os.O_RDONLY, dir_fd=channel._dir_fd)
+                break
+            except FileNotFoundError:
+                continue  # Message file already gone, try the next queued ID
+
+    try:
+        size = os.fstat(msg_fd).st_size
+        if size <= _SMALL_MESSAGE_SIZE:
+            # Small message: one read syscall, then parse the bytes in place
+            message = Message.from_bytes(os.read(msg_fd, size))
+        else:
+            with os.fdopen(msg_fd, "rb", closefd=False) as msg_file:
+                message = Message.read(msg_file)
+    finally:
+        os.close(msg_fd)
+
     try:
-        id_bytes = os.read(channel._fp, 8)
-    except BlockingIOError:
-        # No data available (non-blocking read)
-        return None
+        os.unlink(message_name, dir_fd=channel._dir_fd)
+    except FileNotFoundError:
+        pass  # Removed meanwhile, e.g. by the channel cleanup
 
-    if not id_bytes or len(id_bytes) != 8:
-        # No data available or incomplete ID
-        return None
+    return message
 
-    id = struct.unpack("!Q", id_bytes)[0]
-    message_file_path = channel.directory_path / str(id)
-    if not message_file_path.exists():
-        return None
 
-    with open(message_file_path, "rb") as msg_file:
-        message = Message.read(msg_file)
+def fetch_batch(channel: Channel, max_messages: int = 64) -> list[Message]:
+    """
+    Fetch up to max_messages messages from a channel (non-blocking).
 
-    message_file_path.unlink()
+    Queued message IDs are drained from the FIFO in bulk, so a batch costs a single
+    read syscall on the queue plus one file read per message.
 
-    return message
+    Args:
+        channel: The channel to fetch from
+        max_messages: Maximum number of messages to return
+
+    Returns:
+        The available messages in publication order, empty if none are available
+
+    Raises:
+        ValueError: If max_messages is not positive or a message format is invalid
+        RuntimeError: If channel is not open for reading
+    """
+    if max_messages < 1:
+        raise ValueError("max_messages must be positive")
+
+    messages: list[Message] = []
+    while len(messages) < max_messages:
+        message = fetch(channel)
+        if message is None:
+            break
+        messages.append(message)
+    return messages
 
 
 def subscribe(
@@ -158,37 +481,66 @@ def subscribe(
     # Set up signal handler for graceful shutdown
     shutdown_requested = False
     signal_args: tuple | None = None
+    # Self-pipe written by the signal handler so a pending select returns at once
+    wakeup_read: int | None = None
+    wakeup_write: int | None = None
+    selector: selectors.BaseSelector | None = None
     def signal_handler(signum, frame):
         nonlocal shutdown_requested, signal_args
         shutdown_requested = True
         signal_args = (signum, frame)
         logging.info("Received termination signal, exiting subscribe loop...")
+        if wakeup_write is None:
+            return  # Not waiting yet: the loop checks shutdown_requested first
+        try:
+            os.write(wakeup_write, b"\0")
+        except OSError:
+            pass  # Pipe full: a wakeup is already pending
 
-    # Register SIGTERM and SIGINT handlers
+    # Register SIGTERM and SIGINT handlers, this raises ValueError outside the main
+    # thread before any file descriptor is opened
     original_sigterm = signal.signal(signal.SIGTERM, signal_handler)
     original_sigint = signal.signal(signal.SIGINT, signal_handler)
 
     try:
+        wakeup_read, wakeup_write = os.pipe()
+        os.set_blocking(wakeup_write, False)
+        selector = selectors.DefaultSelector()
+        selector.register(channel._fp, selectors.EVENT_READ)
+        selector.register(wakeup_read, selectors.EVENT_READ)
+
         message_count = 0
-        start_time = time.time()
-        listen_forever = timeout_seconds == 0
-        while not shutdown_requested and (
-            listen_forever or (time.time() - start_time < timeout_seconds)
-        ):
+        deadline = None if timeout_seconds == 0 else time.monotonic() + timeout_seconds
+        while not shutdown_requested:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
             message = fetch(channel)
-            if message:
-                try:
-                    callback(message)
-                except Exception as e:
-                    logging.warning(f"Error processing message {message}: {e}")
-                message_count += 1
-            time.sleep(0.01)  # Sleep briefly to avoid busy waiting
+            if message is None:
+                # Queue drained: block until a message ID arrives, a signal, or timeout
+                selector.select(remaining)
+                continue
+            try:
+                callback(message)
+            except Exception as e:
+                logging.warning("Error processing message %s: %s", message, e)
+            message_count += 1
         if shutdown_requested:
             logging.info("Exiting subscribe loop on '%s'. Handled %i messages.",
                          channel.topic, message_count)
             return -1  # Indicate shutdown by signal
         return message_count
     finally:
+        if selector is not None:
+            selector.close()
+        # Detach the pipe first so a late signal never writes to a reused descriptor
+        wakeup_fds = (wakeup_read, wakeup_write)
+        wakeup_read = wakeup_write = None
+        for fd in wakeup_fds:
+            if fd is not None:
+                os.close(fd)
         # Call original handler if a signal was received
         if signal_args is not None:
             if signal_args[0] == signal.SIGTERM and callable(original_sigterm):
@@ -1 +1,32 @@
-# Test files for pubsub package
\ No newline at end of file
+# Test files for pubsub package
+
+import os
+import shutil
+import tempfile
+from collections.abc import Callable
+
+from pubsub.abstractions import get_base_dir
+
+
+def use_private_base_dir() -> Callable[[], None]:
+    """
+    Point the pubsub base directory at a new private tmpfs directory.
+
+    Returns:
+        A function removing the private directory and restoring the previous base directory
+    """
+    shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    base_dir = tempfile.mkdtemp(prefix="pubsub-test-", dir=shm_dir)
+    previous_home = os.environ.get("PUBSUB_HOME")
+    os.environ["PUBSUB_HOME"] = base_dir
+    get_base_dir.cache_clear()
+
+    def restore() -> None:
+        shutil.rmtree(base_dir, ignore_errors=True)
+        if previous_home is None:
+            os.environ.pop("PUBSUB_HOME", None)
+        else:
+            os.environ["PUBSUB_HOME"] = previous_home
+        get_base_dir.cache_clear()
+
+    return restore
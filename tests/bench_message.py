@@ -0,0 +1,51 @@
+"""Micro-benchmarks for Message serialization.
+
+Not collected by the test runners. Run with:
+
+    python -m tests.bench_message
+"""
+
+import timeit
+
+from pubsub.message import Message
+
+# Payload sizes in bytes: empty, small, medium and large
+CONTENT_SIZES = (0, 64, 1024, 65536)
+
+# Number of headers on each benchmarked message
+HEADER_COUNTS = (0, 8)
+
+
+def bench(content_size: int, header_count: int, repeat: int = 5) -> tuple[float, float]:
+    """
+    Time to_bytes() and from_bytes() for one message shape.
+
+    Args:
+        content_size: Size of the message content in bytes
+        header_count: Number of headers on the message
+        repeat: Number of timing runs, the fastest one is kept
+
+    Returns:
+        Best time per call in microseconds for encoding and decoding
+    """
+    headers = {f"header-{i}": f"value-{i}" for i in range(header_count)}
+    message = Message(topic="bench.message", content=b"x" * content_size, headers=headers)
+    data = message.to_bytes()
+
+    number = 10_000
+    encode = min(timeit.repeat(message.to_bytes, number=number, repeat=repeat))
+    decode = min(timeit.repeat(lambda: Message.from_bytes(data), number=number, repeat=repeat))
+    return encode / number * 1e6, decode / number * 1e6
+
+
+def main() -> None:
+    """Print encode and decode timings for every benchmarked message shape."""
+    print(f"{'content':>8} {'headers':>8} {'encode us':>10} {'decode us':>10}")
+    for content_size in CONTENT_SIZES:
+        for header_count in HEADER_COUNTS:
+            encode, decode = bench(content_size, header_count)
+            print(f"{content_size:>8} {header_count:>8} {encode:>10.2f} {decode:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,55 @@
 """Tests for the Channel class."""
 
 import os
+import shutil
 import unittest
-
-from pubsub.abstractions import get_base_dir
-from pubsub.channel import Channel
+from unittest import mock
+
+from pubsub.abstractions import get_base_dir, is_process_running
+from pubsub.channel import Channel, _compile_topic_pattern
+from tests import use_private_base_dir
+
+# Topics rejected by Channel because of a character outside [a-zA-Z0-9.=+-]
+INVALID_TOPICS = (
+    "test/topic",
+    "test topic",
+    "test@topic",
+    "test#topic",
+    "test$topic",
+    "test%topic",
+    "test&topic",
+    "test*topic",
+    "test(topic)",
+    "test[topic]",
+    "test{topic}",
+    "test|topic",
+    "test\\topic",
+    "test;topic",
+    "test:topic",
+    "test'topic",
+    "test\"topic",
+    "test<topic>",
+    "test?topic",
+)
 
 
 class TestChannel(unittest.TestCase):
     """Test cases for Channel class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Point the pubsub base directory at a private tmpfs directory."""
+        cls.restore_base_dir = use_private_base_dir()
+
+        # Channel shared by the tests that only read its attributes
+        cls.shared = Channel(topic="test.shared")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the private base directory and restore the previous one."""
+        cls.shared.close()
+        cls.restore_base_dir()
+
     def setUp(self):
         """Set up test fixtures."""
         self.test_channels = []
@@ -33,14 +73,12 @@ class TestChannel(unittest.TestCase):
 
     def test_channel_directory_format(self):
         """Test that channel directory follows the correct format."""
-        topic = "test.format"
-        channel = Channel(topic=topic)
-        self.test_channels.append(channel)
+        channel = self.shared
 
         # Directory name should be: {topic}_{random_12_chars}_{process_id}
         parts = channel.directory_name.split('_')
         assert len(parts) == 3
-        assert parts[0] == topic
+        assert parts[0] == "test.shared"
         assert len(parts[1]) == 12  # random_id
         assert parts[2] == str(os.getpid())
 
@@ -61,32 +99,20 @@ class TestChannel(unittest.TestCase):
 
     def test_topic_validation_invalid_chars(self):
         """Test that invalid characters in topic raise ValueError."""
-        invalid_topics = [
-            "test/topic",
-            "test topic",
-            "test@topic",
-            "test#topic",
-            "test$topic",
-            "test%topic",
-            "test&topic",
-            "test*topic",
-            "test(topic)",
-            "test[topic]",
-            "test{topic}",
-            "test|topic",
-            "test\\topic",
-            "test;topic",
-            "test:topic",
-            "test'topic",
-            "test\"topic",
-            "test<topic>",
-            "test?topic",
-        ]
-
-        for invalid_topic in invalid_topics:
-            with self.assertRaises(ValueError) as context:
-                Channel(topic=invalid_topic)
-            assert "invalid characters" in str(context.exception).lower()
+        for invalid_topic in INVALID_TOPICS:
+            with self.subTest(topic=invalid_topic):
+                with self.assertRaises(ValueError) as context:
+                    Channel._validate_topic(invalid_topic)
+                assert "invalid characters" in str(context.exception).lower()
+
+    def test_topic_validation_before_creation(self):
+        """Test that an invalid topic is rejected before any channel setup."""
+        with mock.patch.object(Channel, "_generate_random_id") as generate_random_id, \
+                mock.patch.object(Channel, "_create_channel") as create_channel:
+            with self.assertRaises(ValueError):
+                Channel(topic=INVALID_TOPICS[0])
+        generate_random_id.assert_not_called()
+        create_channel.assert_not_called()
 
     def test_topic_validation_valid_chars(self):
         """Test that valid characters in topic are accepted."""
@@ -106,10 +132,15 @@ class TestChannel(unittest.TestCase):
             "test.+.wildcard",
         ]
 
+        # Validation needs no channel directory
         for valid_topic in valid_topics:
-            channel = Channel(topic=valid_topic)
-            self.test_channels.append(channel)
-            assert channel.topic == valid_topic
+            with self.subTest(topic=valid_topic):
+                Channel._validate_topic(valid_topic)
+
+        # One real channel still goes through the constructor
+        channel = Channel(topic=valid_topics[-1])
+        self.test_channels.append(channel)
+        assert channel.topic == valid_topics[-1]
 
     def test_channel_cleanup(self):
         """Test that cleanup removes directory and FIFO."""
@@ -148,24 +179,29 @@ class TestChannel(unittest.TestCase):
         assert not directory_path.exists()
         assert not queue_path.exists()
 
+    def test_open_fds_not_inherited(self):
+        """Test that the fds held by an open channel are close-on-exec."""
+        with Channel(topic="test.cloexec") as channel:
+            assert not os.get_inheritable(channel._fp)
+            assert not os.get_inheritable(channel._keepalive_fp)
+            assert not os.get_inheritable(channel._dir_fd)
+
     def test_str_representation(self):
         """Test channel string representation."""
-        channel = Channel(topic="test.str")
-        self.test_channels.append(channel)
+        channel = self.shared
 
         str_repr = str(channel)
         assert "Channel" in str_repr
-        assert "test.str" in str_repr
+        assert "test.shared" in str_repr
         assert channel.directory_name in str_repr
 
     def test_repr_representation(self):
         """Test channel repr representation."""
-        channel = Channel(topic="test.repr")
-        self.test_channels.append(channel)
+        channel = self.shared
 
         repr_str = repr(channel)
         assert "Channel" in repr_str
-        assert "test.repr" in repr_str
+        assert "test.shared" in repr_str
         assert str(channel.process_id) in repr_str
         assert channel.random_id in repr_str
 
@@ -174,17 +210,10 @@ class TestChannel(unittest.TestCase):
         # Clean up any existing channels first (best effort)
         base_dir = get_base_dir()
         if base_dir.exists():
-            for item in base_dir.iterdir():
-                if item.is_dir():
-                    try:
-                        for subitem in item.iterdir():
-                            try:
-                                subitem.unlink()
-                            except OSError:
-                                pass  # Skip FIFOs and other special files
-                        item.rmdir()
-                    except OSError:
-                        pass  # Directory not empty or other issue
+            with os.scandir(base_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path, ignore_errors=True)
 
         active = Channel.active_paths()
         # Should be empty or only contain channels from this process
@@ -231,6 +260,27 @@ class TestChannel(unittest.TestCase):
             if fake_dir.exists():
                 fake_dir.rmdir()
 
+    def test_inactive_paths_checks_each_pid_once(self):
+        """Test that many stale channels of one process cost a single liveness check."""
+        base_dir = get_base_dir()
+        base_dir.mkdir(parents=True, exist_ok=True)
+        fake_pid = 999999998
+        fake_dirs = [base_dir / f"test.stale{i}_abc123def456_{fake_pid}" for i in range(100)]
+        for fake_dir in fake_dirs:
+            fake_dir.mkdir()
+
+        try:
+            with mock.patch(
+                "pubsub.channel.is_process_running", wraps=is_process_running
+            ) as is_running:
+                inactive = Channel.inactive_paths()
+
+            assert set(fake_dirs) <= set(inactive)
+            assert [c.args for c in is_running.call_args_list].count((fake_pid,)) == 1
+        finally:
+            for fake_dir in fake_dirs:
+                fake_dir.rmdir()
+
     def test_matching_active_paths_exact(self):
         """Test matching_active_paths with exact match."""
         channel = Channel(topic="exact.match.topic")
@@ -268,6 +318,34 @@ class TestChannel(unittest.TestCase):
         assert any(p.name.startswith("test.+") for p in matches_single)
         assert any(p.name.startswith("test.+") for p in matches_multi)
 
+    def test_matching_active_paths_many_channels(self):
+        """Test matching among many channels compiles each topic pattern once."""
+        patterns = ["many.exac=", "many.+", "many.exact", "other.+"]
+        channels = [Channel(topic=patterns[i % len(patterns)]) for i in range(200)]
+        self.test_channels.extend(channels)
+        expected = {c.directory_name for c in channels if c.topic != "other.+"}
+
+        # Age the base directory so its listing is trusted and cached
+        base_dir = get_base_dir()
+        past_ns = os.stat(base_dir).st_mtime_ns - 10_000_000_000
+        os.utime(base_dir, ns=(past_ns, past_ns))
+
+        _compile_topic_pattern.cache_clear()
+        names = {p.name for p in Channel.matching_active_paths("many.exact")}
+
+        assert expected <= names
+        assert not any(name.startswith("other.") for name in names)
+        # One compilation per distinct pattern in the listing, however many channels share it
+        listed_patterns = {path.name.partition("_")[0] for path, _ in Channel._scan_paths()}
+        assert _compile_topic_pattern.cache_info().misses == len(listed_patterns)
+
+        # Unchanged base directory: no rescan and no new compilation
+        with mock.patch.object(Channel, "_scan_paths", wraps=Channel._scan_paths) as scan:
+            again = {p.name for p in Channel.matching_active_paths("many.exact")}
+        assert again == names
+        scan.assert_not_called()
+        assert _compile_topic_pattern.cache_info().misses == len(listed_patterns)
+
     def test_matching_active_paths_no_match(self):
         """Test matching_active_paths with no matching channels."""
         channel = Channel(topic="specific.topic")
@@ -278,6 +356,29 @@ class TestChannel(unittest.TestCase):
         # Should not include our channel
         assert not any(p.name == channel.directory_name for p in matches)
 
+    def test_matching_active_paths_cached_listing(self):
+        """Test that a cached channel listing is refreshed when channels change."""
+        channel1 = Channel(topic="cached.listing")
+        self.test_channels.append(channel1)
+
+        # Age the base directory so its listing is trusted and cached
+        base_dir = get_base_dir()
+        past_ns = os.stat(base_dir).st_mtime_ns - 10_000_000_000
+        os.utime(base_dir, ns=(past_ns, past_ns))
+        matches = Channel.matching_active_paths("cached.listing")
+        assert [p.name for p in matches] == [channel1.directory_name]
+        assert Channel.matching_active_paths("cached.listing") == matches
+
+        channel2 = Channel(topic="cached.listing")
+        self.test_channels.append(channel2)
+        names = {p.name for p in Channel.matching_active_paths("cached.listing")}
+        assert names == {channel1.directory_name, channel2.directory_name}
+
+        channel1.open()
+        channel1.close()
+        names = {p.name for p in Channel.matching_active_paths("cached.listing")}
+        assert names == {channel2.directory_name}
+
     def test_channel_base_dir(self):
         """Test that channels are created in the correct base directory."""
         channel = Channel(topic="test.basedir")
@@ -1,14 +1,47 @@
 """Tests for the Message class."""
 
+import io
+import os
+import tempfile
 import time
 import unittest
 
-from pubsub.message import Header, Message
+from pubsub.message import (
+    _HEADER,
+    MESSAGE_FORMAT_VERSION,
+    MESSAGE_MAGIC_NUMBER,
+    Header,
+    Message,
+)
+
+
+class ChunkedStream(io.RawIOBase):
+    """Stream returning at most a few bytes per read, like a pipe under load."""
+
+    def __init__(self, data: bytes, chunk_size: int = 3):
+        self._data = data
+        self._position = 0
+        self._chunk_size = chunk_size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = min(self._chunk_size, len(buffer), len(self._data) - self._position)
+        buffer[:count] = self._data[self._position:self._position + count]
+        self._position += count
+        return count
 
 
 class TestMessage(unittest.TestCase):
     """Test cases for Message class."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Serialize one reference message shared by the decoding tests."""
+        cls.REF_MESSAGE = Message(topic="test.ref", content=b"x" * 100, headers={"a": 1})
+        cls.REF_BYTES = cls.REF_MESSAGE.to_bytes()
+
     def test_message_creation(self):
         """Test basic message creation."""
         topic = "test.topic"
@@ -20,16 +53,27 @@ class TestMessage(unittest.TestCase):
         assert message.content == data
         assert message.id > 0
 
+        # Slotted: no per-instance __dict__
+        assert not hasattr(message, "__dict__")
+
     def test_message_id_uniqueness(self):
         """Test that message IDs are unique."""
         message1 = Message(topic="test", content=b"data1")
         message2 = Message(topic="test", content=b"data2")
 
-        # IDs should be unique (random bits ensure this even in same microsecond)
+        # IDs come from a per-process counter, ordering is covered by test_message_id_monotonic
         assert message1.id != message2.id
 
-        # IDs should generally increase over time (high bits are time-based)
-        # Note: Due to random low bits, exact ordering within same microsecond is not guaranteed
+        # The low bits tell apart processes running at the same time
+        assert message1.id & 0xFFFF == message2.id & 0xFFFF == os.getpid() & 0xFFFF
+
+    def test_message_id_monotonic(self):
+        """Test that message IDs strictly increase within a process."""
+        ids = [Message(topic="test", content=b"").id for _ in range(1000)]
+
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        assert all(0 < message_id < 2**64 for message_id in ids)
 
     def test_binary_serialization(self):
         """Test message serialization to bytes."""
@@ -50,6 +94,52 @@ class TestMessage(unittest.TestCase):
         assert deserialized.content == original_message.content
         assert deserialized.id == original_message.id
 
+    def test_serialization_layout(self):
+        """Test the fixed prefix size and that serialization is deterministic."""
+        # magic (4) + version (1) + id (8) + timestamp (8) + topic length (4)
+        assert _HEADER.size == 25
+
+        serialized = self.REF_BYTES
+        assert self.REF_MESSAGE.to_bytes() == serialized
+        assert serialized[: _HEADER.size] == _HEADER.pack(
+            MESSAGE_MAGIC_NUMBER,
+            MESSAGE_FORMAT_VERSION,
+            self.REF_MESSAGE.id,
+            self.REF_MESSAGE.timestamp,
+            len("test.ref"),
+        )
+
+    def test_read_partial_chunks(self):
+        """Test that reading handles streams returning partial chunks."""
+        deserialized = Message.read(ChunkedStream(self.REF_BYTES))
+
+        assert deserialized.id == self.REF_MESSAGE.id
+        assert deserialized.headers == {"a": 1}
+        assert deserialized.content == self.REF_MESSAGE.content
+
+        # A truncated stream is reported as an error
+        with self.assertRaises(ValueError):
+            Message.read(ChunkedStream(self.REF_BYTES[:-1]))
+
+    def test_from_bytes_invalid(self):
+        """Test that truncated or foreign data is rejected."""
+        with self.assertRaises(ValueError):
+            Message.from_bytes(self.REF_BYTES[:-1])
+
+        with self.assertRaises(ValueError) as context:
+            Message.from_bytes(b"XXXX" + self.REF_BYTES[4:])
+        assert "magic number" in str(context.exception)
+
+    def test_write_fd(self):
+        """Test writing a message straight to a file descriptor."""
+        with tempfile.TemporaryFile() as temp_file:
+            self.REF_MESSAGE.write_fd(temp_file.fileno())
+            temp_file.seek(0)
+            data = temp_file.read()
+
+        assert data == self.REF_BYTES
+        assert Message.from_bytes(data).content == self.REF_MESSAGE.content
+
     def test_empty_data(self):
         """Test message with empty data."""
         message = Message(topic="empty.test", content=b"")
@@ -92,21 +182,18 @@ class TestMessage(unittest.TestCase):
 
     def test_timestamp(self):
         """Test message timestamp field."""
-        # Create message and capture creation time with some tolerance
-        before = time.time() - 0.01  # Add 10ms buffer before
+        # Capture creation time as integer microseconds, like the timestamp itself
+        before = time.time_ns() // 1_000
         message = Message(topic="test", content=b"data")
-        after = time.time() + 0.01  # Add 10ms buffer after
+        after = time.time_ns() // 1_000
 
-        # Get timestamp (now an integer in microseconds)
+        # Get timestamp (an integer in microseconds)
         timestamp = message.timestamp
 
         # Verify it's an integer
         assert isinstance(timestamp, int)
         assert timestamp > 0
-
-        # Convert to seconds for comparison
-        timestamp_seconds = timestamp / 1_000_000
-        assert before <= timestamp_seconds <= after
+        assert before <= timestamp <= after
 
         # Test that timestamp is preserved through serialization
         serialized = message.to_bytes()
@@ -130,6 +217,10 @@ class TestMessage(unittest.TestCase):
 
         assert deserialized.headers == {}
 
+        # Each deserialized message gets its own headers dictionary
+        deserialized.headers["k"] = "v"
+        assert Message.from_bytes(serialized).headers == {}
+
     def test_headers_with_values(self):
         """Test message with headers."""
         headers : Header = {
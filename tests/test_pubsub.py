@@ -1,12 +1,31 @@
 """Tests for the PubSub module."""
 
 import multiprocessing
+import os
 import threading
 import time
 import unittest
+from unittest import mock
 
+from pubsub import pubsub as pubsub_module
 from pubsub.channel import Channel
-from pubsub.pubsub import fetch, publish, subscribe
+from pubsub.message import Message
+from pubsub.pubsub import fetch, fetch_batch, publish, publish_batch, subscribe
+from tests import use_private_base_dir
+
+# Restores the base directory replaced by setUpModule()
+_restore_base_dir = None
+
+
+def setUpModule():
+    """Point the pubsub base directory at a private tmpfs directory."""
+    global _restore_base_dir
+    _restore_base_dir = use_private_base_dir()
+
+
+def tearDownModule():
+    """Remove the private base directory and restore the previous one."""
+    _restore_base_dir()
 
 
 class TestPublish(unittest.TestCase):
@@ -47,6 +66,111 @@ class TestPublish(unittest.TestCase):
                 message_files = [f for f in files if f.name != "queue"]
                 assert len(message_files) == 1
 
+    def test_publish_after_channel_replaced(self):
+        """Test publishing keeps working when a channel is closed and replaced."""
+        topic = "test.publish.replaced"
+        with Channel(topic=topic) as channel:
+            assert publish(topic, b"first") == 1
+            assert publish(topic, b"second") == 1
+            assert [m.content for m in fetch_batch(channel)] == [b"first", b"second"]
+
+        with Channel(topic=topic) as channel:
+            assert publish(topic, b"third") == 1
+            message = fetch(channel)
+            assert message is not None
+            assert message.content == b"third"
+
+    def test_publish_to_full_queue(self):
+        """Test publishing to a full queue leaves no message file behind."""
+        topic = "test.publish.full"
+        with Channel(topic=topic) as channel:
+            queue_fd = os.open(channel.directory_path / "queue", os.O_WRONLY | os.O_NONBLOCK)
+            try:
+                # Fill the FIFO so the next ID cannot be written
+                while True:
+                    try:
+                        os.write(queue_fd, b"\0" * 4096)
+                    except BlockingIOError:
+                        break
+                assert publish(topic, b"dropped") == 0
+            finally:
+                os.close(queue_fd)
+
+            files = [f.name for f in channel.directory_path.iterdir()]
+            assert files == ["queue"]
+
+    def test_publish_id_collision_keeps_pending_message(self):
+        """Test that a message with the ID of a pending one never overwrites it."""
+        for channel_count in (1, 2):
+            with self.subTest(channel_count=channel_count):
+                topic = f"test.publish.collision{channel_count}"
+                channels = [Channel(topic=topic) for _ in range(channel_count)]
+                for channel in channels:
+                    channel.open()
+                try:
+                    with mock.patch.object(Message, "_next_id", return_value=42):
+                        assert publish(topic, b"pending") == channel_count
+                        with self.assertLogs(level="WARNING"):
+                            assert publish(topic, b"colliding") == 0
+
+                    for channel in channels:
+                        assert [m.content for m in fetch_batch(channel)] == [b"pending"]
+                finally:
+                    for channel in channels:
+                        channel.close()
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "requires /proc/self/fd")
+    def test_closed_channel_releases_queue_writer(self):
+        """Test that closing a channel closes the queue write end cached by publish."""
+        topic = "test.publish.writer.close"
+        fd_count = len(os.listdir("/proc/self/fd"))
+        for _ in range(5):
+            with Channel(topic=topic) as channel:
+                assert publish(topic, b"reply") == 1
+                assert channel._queue_str in pubsub_module._queue_writers
+
+            assert channel._queue_str not in pubsub_module._queue_writers
+
+        assert len(os.listdir("/proc/self/fd")) == fd_count
+
+    def test_removed_channel_queue_writer_dropped(self):
+        """Test that writers cached for channels removed elsewhere are closed on next open."""
+        topic = "test.publish.writer.removed"
+        with Channel(topic=topic) as channel:
+            assert publish(topic, b"first") == 1
+            # Removed the way another process's cleanup would, without this process knowing
+            Channel._delete_recursive(channel._directory_str)
+
+            with Channel(topic=topic) as replacement:
+                assert publish(topic, b"second") == 1
+                assert channel._queue_str not in pubsub_module._queue_writers
+                assert replacement._queue_str in pubsub_module._queue_writers
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_publish_in_child_forked_while_locked(self):
+        """Test that a child forked while the queue writer lock is held can publish."""
+        topic = "test.publish.fork"
+        with Channel(topic=topic) as channel:
+            assert publish(topic, b"parent") == 1
+
+            with pubsub_module._queue_writers_lock:
+                pid = os.fork()
+                if pid == 0:
+                    # Child: the inherited lock is held and its cache must not be reused
+                    ok = not pubsub_module._queue_writers and publish(topic, b"child") == 1
+                    os._exit(0 if ok else 1)
+
+            deadline = time.monotonic() + 5
+            while (result := os.waitpid(pid, os.WNOHANG)) == (0, 0):
+                if time.monotonic() > deadline:
+                    os.kill(pid, 9)
+                    os.waitpid(pid, 0)
+                    self.fail("Forked child deadlocked on publish")
+                time.sleep(0.01)
+
+            assert os.waitstatus_to_exitcode(result[1]) == 0
+            assert [m.content for m in fetch_batch(channel)] == [b"parent", b"child"]
+
     def test_publish_with_wildcard_match(self):
         """Test publishing with wildcard matching."""
         wildcard_topic = "test.+"
@@ -120,6 +244,88 @@ class TestPublish(unittest.TestCase):
                "alphanumeric" in str(context.exception).lower()
 
 
+class TestPublishBatch(unittest.TestCase):
+    """Test cases for publish_batch function."""
+
+    def test_publish_batch_in_order(self):
+        """Test that a batch is received in the order given."""
+        topic = "test.publish.batch"
+        contents = [f"message {i}".encode() for i in range(10)]
+
+        with Channel(topic=topic) as channel:
+            count = publish_batch(topic, contents, headers={"batch": True})
+
+            assert count == 1
+            messages = fetch_batch(channel)
+            assert [m.content for m in messages] == contents
+            assert all(m.headers == {"batch": True} for m in messages)
+
+    def test_publish_batch_headers_not_shared(self):
+        """Test that every message of a batch gets its own headers dictionary."""
+        topic = "test.publish.batch.headers"
+        headers = {"batch": True}
+
+        with Channel(topic=topic), mock.patch.object(
+            pubsub_module, "_deliver", return_value=1
+        ) as deliver:
+            assert publish_batch(topic, [b"first", b"second"], headers=headers) == 1
+
+        messages = deliver.call_args.args[1]
+        assert [m.headers for m in messages] == [headers, headers]
+        assert messages[0].headers is not messages[1].headers
+        assert all(m.headers is not headers for m in messages)
+
+    def test_publish_batch_multiple_channels(self):
+        """Test that every matching channel receives the whole batch."""
+        topic = "test.publish.batch.multi"
+        contents = [b"first", b"second", b"third"]
+
+        with Channel(topic=topic) as channel1, Channel(topic="test.publish.batch.+") as channel2:
+            count = publish_batch(topic, contents)
+
+            assert count == 2
+            for channel in (channel1, channel2):
+                assert [m.content for m in fetch_batch(channel)] == contents
+
+    def test_publish_batch_larger_than_pipe_buf(self):
+        """Test that a batch spanning several queue writes is received whole and in order."""
+        topic = "test.publish.batch.large"
+        contents = [str(i).encode() for i in range(1000)]
+
+        with Channel(topic=topic) as channel:
+            assert publish_batch(topic, contents) == 1
+            assert [m.content for m in fetch_batch(channel, max_messages=2000)] == contents
+
+    def test_publish_batch_larger_than_queue(self):
+        """Test that a batch overflowing the queue keeps what fits and leaves no orphan files."""
+        topic = "test.publish.batch.overflow"
+        contents = [str(i).encode() for i in range(10000)]
+
+        with Channel(topic=topic) as channel:
+            with self.assertLogs(level="WARNING"):
+                assert publish_batch(topic, contents) == 1
+
+            received = [m.content for m in fetch_batch(channel, max_messages=len(contents))]
+            assert 0 < len(received) < len(contents)
+            assert received == contents[: len(received)]
+
+            files = [f.name for f in channel.directory_path.iterdir()]
+            assert files == ["queue"]
+
+    def test_publish_batch_empty(self):
+        """Test that an empty batch publishes nothing."""
+        topic = "test.publish.batch.empty"
+
+        with Channel(topic=topic) as channel:
+            assert publish_batch(topic, []) == 0
+            assert fetch(channel) is None
+
+    def test_publish_batch_invalid_topic(self):
+        """Test that wildcards are rejected when publishing a batch."""
+        with self.assertRaises(ValueError):
+            publish_batch("test.+", [b"data"])
+
+
 class TestFetch(unittest.TestCase):
     """Test cases for fetch function."""
 
@@ -224,6 +430,25 @@ class TestFetch(unittest.TestCase):
             assert message.id > 0
             assert message.timestamp > 0
 
+    def test_fetch_large_message(self):
+        """Test fetching messages on both sides of the small-message threshold."""
+        topic = "test.fetch.large"
+        channel = Channel(topic=topic)
+
+        with channel:
+            small = b"s" * 100
+            large = b"L" * (1024 * 1024)
+            publish(topic, small, headers={"size": "small"})
+            publish(topic, large, headers={"size": "large"})
+
+            message1 = fetch(channel)
+            message2 = fetch(channel)
+
+            assert message1 is not None and message1.content == small
+            assert message1.headers == {"size": "small"}
+            assert message2 is not None and message2.content == large
+            assert message2.headers == {"size": "large"}
+
     def test_fetch_with_empty_content(self):
         """Test fetching message with empty content."""
         topic = "test.fetch.empty.content"
@@ -239,6 +464,69 @@ class TestFetch(unittest.TestCase):
             assert message is not None
             assert message.content == b""
 
+    def test_fetch_from_several_threads(self):
+        """Test that threads fetching from one channel receive every message exactly once."""
+        topic = "test.fetch.threads"
+        contents = [str(i).encode() for i in range(5000)]
+        received = []
+
+        def drain():
+            while (message := fetch(channel)) is not None:
+                received.append(message.content)
+
+        with Channel(topic=topic) as channel:
+            assert publish_batch(topic, contents) == 1
+            threads = [threading.Thread(target=drain) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert sorted(received) == sorted(contents)
+            files = [f.name for f in channel.directory_path.iterdir()]
+            assert files == ["queue"]
+
+
+class TestFetchBatch(unittest.TestCase):
+    """Test cases for fetch_batch function."""
+
+    def test_fetch_batch_drains_queue(self):
+        """Test fetching all queued messages in order."""
+        topic = "test.fetch.batch"
+        channel = Channel(topic=topic)
+
+        with channel:
+            for i in range(5):
+                publish(topic, f"message {i}".encode())
+
+            messages = fetch_batch(channel)
+
+            assert [m.content for m in messages] == [f"message {i}".encode() for i in range(5)]
+            assert fetch_batch(channel) == []
+
+    def test_fetch_batch_max_messages(self):
+        """Test that fetch_batch returns at most max_messages messages."""
+        topic = "test.fetch.batch.max"
+        channel = Channel(topic=topic)
+
+        with channel:
+            for i in range(5):
+                publish(topic, f"message {i}".encode())
+
+            first = fetch_batch(channel, max_messages=3)
+            rest = fetch_batch(channel, max_messages=3)
+
+            assert [m.content for m in first] == [b"message 0", b"message 1", b"message 2"]
+            assert [m.content for m in rest] == [b"message 3", b"message 4"]
+
+    def test_fetch_batch_invalid_max(self):
+        """Test that a non-positive max_messages raises ValueError."""
+        channel = Channel(topic="test.fetch.batch.invalid")
+
+        with channel:
+            with self.assertRaises(ValueError):
+                fetch_batch(channel, max_messages=0)
+
 
 class TestSubscribe(unittest.TestCase):
     """Test cases for subscribe function."""
@@ -258,8 +546,8 @@ class TestSubscribe(unittest.TestCase):
 
         with channel:
             # Publish messages in a separate thread
+            # The channel is already open, so messages queue until subscribe runs
             def publisher():
-                time.sleep(0.05)  # Small delay to ensure subscriber is ready
                 publish(topic, b"message 1")
                 publish(topic, b"message 2")
                 publish(topic, b"message 3")
@@ -290,13 +578,35 @@ class TestSubscribe(unittest.TestCase):
             def callback(message):
                 self.received_messages.append(message)
 
-            start_time = time.time()
+            start_time = time.monotonic()
             count = subscribe(channel, callback, timeout_seconds=0.2)
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
 
             assert count == 0
             assert 0.15 <= elapsed <= 0.3  # Allow some tolerance
 
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "requires /proc/self/fd")
+    def test_subscribe_outside_main_thread_leaks_no_fd(self):
+        """Test that subscribe fails from a non-main thread without leaking descriptors."""
+        topic = "test.subscribe.thread"
+        errors = []
+
+        def run():
+            try:
+                subscribe(channel, lambda message: None, timeout_seconds=0.1)
+            except ValueError as e:
+                errors.append(e)
+
+        with Channel(topic=topic) as channel:
+            fd_count = len(os.listdir("/proc/self/fd"))
+            for _ in range(5):
+                thread = threading.Thread(target=run)
+                thread.start()
+                thread.join()
+
+            assert len(errors) == 5
+            assert len(os.listdir("/proc/self/fd")) == fd_count
+
     def test_subscribe_negative_timeout(self):
         """Test that subscribe raises error for negative timeout."""
         topic = "test.subscribe.negative"
@@ -313,13 +623,14 @@ class TestSubscribe(unittest.TestCase):
         """Test that subscribe continues on callback exception."""
         topic = "test.subscribe.exception"
 
-        def subscriber_process(topic, result_queue):
+        def subscriber_process(topic, result_queue, ready):
             """Subprocess that subscribes with callback that raises exception."""
             channel = Channel(topic=topic)
             received = []
             call_count = [0]
 
             with channel:
+                ready.set()  # Channel is open: publishes now queue up
                 def callback(message):
                     call_count[0] += 1
                     if call_count[0] == 1:
@@ -335,11 +646,14 @@ class TestSubscribe(unittest.TestCase):
         result_queue = multiprocessing.Queue()
 
         # Start subscriber in subprocess
-        sub_proc = multiprocessing.Process(target=subscriber_process, args=(topic, result_queue))
+        ready = multiprocessing.Event()
+        sub_proc = multiprocessing.Process(
+            target=subscriber_process, args=(topic, result_queue, ready)
+        )
         sub_proc.start()
 
         # Publish messages
-        time.sleep(0.1)  # Ensure subscriber is ready
+        assert ready.wait(timeout=2)
         publish(topic, b"message 1")
         publish(topic, b"message 2")
 
@@ -354,6 +668,32 @@ class TestSubscribe(unittest.TestCase):
         assert len(result["received"]) == 1  # Only second message added
         assert result["received"][0] == "message 2"
 
+    def test_subscribe_exits_on_sigterm(self):
+        """Test that a blocked subscribe returns promptly on SIGTERM."""
+        topic = "test.subscribe.sigterm"
+
+        def subscriber_process(topic, result_queue):
+            """Subprocess that listens indefinitely until terminated."""
+            channel = Channel(topic=topic)
+            with channel:
+                result_queue.put("ready")
+                count = subscribe(channel, lambda message: None, timeout_seconds=0)
+            result_queue.put(count)
+
+        result_queue = multiprocessing.Queue()
+        proc = multiprocessing.Process(target=subscriber_process, args=(topic, result_queue))
+        proc.start()
+        assert result_queue.get(timeout=2) == "ready"
+        time.sleep(0.1)  # Let the subscriber block in its wait
+
+        start_time = time.monotonic()
+        proc.terminate()
+        proc.join(timeout=1)
+
+        assert not proc.is_alive()
+        assert time.monotonic() - start_time < 0.5
+        assert result_queue.get(timeout=1) == -1
+
     def test_subscribe_zero_timeout_exits_quickly(self):
         """Test that timeout=0 means listen indefinitely (needs manual stop)."""
         topic = "test.subscribe.zero"
@@ -387,12 +727,13 @@ class TestIntegration(unittest.TestCase):
         """Test complete publish-subscribe flow."""
         topic = "test.integration.flow"
 
-        def subscriber_process(topic, result_queue):
+        def subscriber_process(topic, result_queue, ready):
             """Subprocess that subscribes and reports results."""
             channel = Channel(topic=topic)
             received = []
 
             with channel:
+                ready.set()  # Channel is open: publishes now queue up
                 def callback(message):
                     received.append({"content": message.content.decode(), "topic": message.topic})
                 subscribe(channel, callback, timeout_seconds=1.0)
@@ -404,11 +745,14 @@ class TestIntegration(unittest.TestCase):
         result_queue = multiprocessing.Queue()
 
         # Start subscriber in subprocess
-        sub_proc = multiprocessing.Process(target=subscriber_process, args=(topic, result_queue))
+        ready = multiprocessing.Event()
+        sub_proc = multiprocessing.Process(
+            target=subscriber_process, args=(topic, result_queue, ready)
+        )
         sub_proc.start()
 
         # Publish messages
-        time.sleep(0.1)  # Ensure subscriber is ready
+        assert ready.wait(timeout=2)
         publish(topic, b"Hello")
         publish(topic, b"World")
 
@@ -426,12 +770,13 @@ class TestIntegration(unittest.TestCase):
         """Test multiple subscribers to same topic."""
         topic = "test.integration.multi"
 
-        def subscriber_process(topic, result_queue, subscriber_id):
+        def subscriber_process(topic, result_queue, subscriber_id, ready):
             """Subprocess that subscribes and reports results."""
             channel = Channel(topic=topic)
             received = []
 
             with channel:
+                ready.set()  # Channel is open: publishes now queue up
                 def callback(message):
                     received.append(message.content.decode())
                 subscribe(channel, callback, timeout_seconds=1.0)
@@ -443,15 +788,16 @@ class TestIntegration(unittest.TestCase):
         result_queue = multiprocessing.Queue()
 
         # Start two subscribers in separate subprocesses
+        ready1, ready2 = multiprocessing.Event(), multiprocessing.Event()
         sub1_proc = multiprocessing.Process(target=subscriber_process,
-                                            args=(topic, result_queue, 1))
+                                            args=(topic, result_queue, 1, ready1))
         sub2_proc = multiprocessing.Process(target=subscriber_process,
-                                            args=(topic, result_queue, 2))
+                                            args=(topic, result_queue, 2, ready2))
         sub1_proc.start()
         sub2_proc.start()
 
         # Publish messages
-        time.sleep(0.1)
+        assert ready1.wait(timeout=2) and ready2.wait(timeout=2)
         data = b"Broadcast message"
         count = publish(topic, data)
 
@@ -475,12 +821,13 @@ class TestIntegration(unittest.TestCase):
         """Test that messages are received in order."""
         topic = "test.integration.order"
 
-        def subscriber_process(topic, result_queue):
+        def subscriber_process(topic, result_queue, ready):
             """Subprocess that subscribes and reports results in order."""
             channel = Channel(topic=topic)
             received = []
 
             with channel:
+                ready.set()  # Channel is open: publishes now queue up
                 def callback(message):
                     received.append(message.content.decode())
                 subscribe(channel, callback, timeout_seconds=1.5)
@@ -492,14 +839,16 @@ class TestIntegration(unittest.TestCase):
         result_queue = multiprocessing.Queue()
 
         # Start subscriber in subprocess
-        sub_proc = multiprocessing.Process(target=subscriber_process, args=(topic, result_queue))
+        ready = multiprocessing.Event()
+        sub_proc = multiprocessing.Process(
+            target=subscriber_process, args=(topic, result_queue, ready)
+        )
         sub_proc.start()
 
         # Publish multiple messages
-        time.sleep(0.1)
+        assert ready.wait(timeout=2)
         for i in range(10):
             publish(topic, f"message {i}".encode())
-            time.sleep(0.01)  # Small delay between publishes
 
         # Wait for subscriber
         sub_proc.join()
@@ -540,12 +889,13 @@ class TestIntegration(unittest.TestCase):
         topic1 = "test.integration.topic1"
         topic2 = "test.integration.topic2"
 
-        def subscriber_process(topic, result_queue, topic_id):
+        def subscriber_process(topic, result_queue, topic_id, ready):
             """Subprocess that subscribes and reports results."""
             channel = Channel(topic=topic)
             received = []
 
             with channel:
+                ready.set()  # Channel is open: publishes now queue up
                 def callback(message):
                     received.append({"content": message.content.decode(), "topic": message.topic})
                 subscribe(channel, callback, timeout_seconds=0.5)
@@ -557,14 +907,15 @@ class TestIntegration(unittest.TestCase):
         result_queue = multiprocessing.Queue()
 
         # Start both subscribers in separate subprocesses
+        ready1, ready2 = multiprocessing.Event(), multiprocessing.Event()
         sub1_proc = multiprocessing.Process(target=subscriber_process,
-                                            args=(topic1, result_queue, 1))
+                                            args=(topic1, result_queue, 1, ready1))
         sub2_proc = multiprocessing.Process(target=subscriber_process,
-                                            args=(topic2, result_queue, 2))
+                                            args=(topic2, result_queue, 2, ready2))
         sub1_proc.start()
         sub2_proc.start()
 
-        time.sleep(0.1)
+        assert ready1.wait(timeout=2) and ready2.wait(timeout=2)
 
         # Publish to different topics
         publish(topic1, b"for topic 1")